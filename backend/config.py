@@ -1,8 +1,8 @@
-from functools import lru_cache
-import json
+from functools import cache
 from pathlib import Path
 from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
 
+import orjson
 from pydantic import field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -16,6 +16,10 @@ class Settings(BaseSettings):
         "http://localhost:5173",
         "http://127.0.0.1:5173",
     ]
+    db_pool_min: int = 2
+    db_pool_max: int = 10
+    db_idle_lifetime: int = 300
+    analysis_tile_count: int = 2
 
     @field_validator("database_url", mode="before")
     @classmethod
@@ -27,6 +31,10 @@ class Settings(BaseSettings):
         if not raw_value:
             return value
 
+        # Fast path: only Render URLs without an explicit sslmode need rewriting.
+        if "render.com" not in raw_value.lower() or "sslmode=" in raw_value:
+            return value
+
         parsed = urlparse(raw_value)
         if parsed.scheme not in {"postgres", "postgresql"}:
             return value
@@ -51,13 +59,13 @@ class Settings(BaseSettings):
                 return []
             if raw_value.startswith("["):
                 try:
-                    parsed = json.loads(raw_value)
-                except json.JSONDecodeError:
+                    parsed = orjson.loads(raw_value)
+                except orjson.JSONDecodeError:
                     return [raw_value]
                 if isinstance(parsed, list):
-                    return [str(item).strip() for item in parsed if str(item).strip()]
+                    return list(filter(None, map(str.strip, map(str, parsed))))
                 return [raw_value]
-            return [item.strip() for item in raw_value.split(",") if item.strip()]
+            return list(filter(None, map(str.strip, raw_value.split(","))))
         return value
 
     model_config = SettingsConfigDict(
@@ -67,6 +75,6 @@ class Settings(BaseSettings):
     )
 
 
-@lru_cache
+@cache
 def get_settings() -> Settings:
     return Settings()
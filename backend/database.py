@@ -1,14 +1,119 @@
 from __future__ import annotations
 
 import ssl
-import json
+import math
+import asyncio
 import logging
+import itertools
 import asyncpg
-from typing import Any
+import orjson
+from cachetools import TTLCache
+from contextlib import aclosing
+from typing import Any, AsyncIterator
 
 # Configure logger
 logger = logging.getLogger(__name__)
 
+# Permissive SSL context for Render internal connections, built once per process.
+_SSL_CONTEXT = ssl.create_default_context()
+_SSL_CONTEXT.check_hostname = False
+_SSL_CONTEXT.verify_mode = ssl.CERT_NONE
+
+# Kept as one constant so asyncpg's per-connection statement cache reuses the
+# server-side prepared statement (and its plan) across requests.
+_ANALYZE_SQL = """
+    WITH parcels AS (
+        SELECT
+            cp.area_ha,
+            cp.landuse,
+            cp.geom
+        FROM candidate_parcels cp
+        -- Bbox centre from a single Box2D call; OFFSET 0 keeps it from being inlined.
+        CROSS JOIN LATERAL (
+            SELECT (ST_XMin(bx) + ST_XMax(bx)) / 2 AS centre_x
+            FROM Box2D(cp.geom) AS bx
+            OFFSET 0
+        ) c
+        WHERE cp.area_ha >= $1
+          AND cp.geom IS NOT NULL
+          AND NOT ST_IsEmpty(cp.geom)
+          -- Tile filter: the envelope lets the GiST index pick the strip's parcels,
+          -- the half-open centre test assigns border parcels to exactly one strip.
+          AND cp.geom && ST_MakeEnvelope($8, $9, $10, $11, 25832)
+          AND c.centre_x >= $6
+          AND c.centre_x < $7
+          -- Cheap pre-filter on the uncut parcel (a superset of its cut remains),
+          -- so far-away parcels never reach ST_Difference.
+          AND EXISTS (
+              SELECT 1
+              FROM grid_infrastructure g
+              WHERE ST_DWithin(cp.geom, g.geom, $4)
+          )
+    ),
+    parcels_cut AS (
+        SELECT
+            p.area_ha,
+            p.landuse,
+            COALESCE(ST_Difference(p.geom, x.geom), p.geom) AS geom
+        FROM parcels p
+        LEFT JOIN LATERAL (
+            SELECT ST_Union(e.geom) AS geom
+            FROM exclusion_zones_buffered e
+            WHERE ST_Intersects(p.geom, e.geom)
+              AND (
+                    (e.category = 'residential' AND e.buffer_m = $2)
+                 OR ($3 AND e.category IN ('woodland', 'park', 'water', 'nature_reserve'))
+              )
+        ) x ON TRUE
+    ),
+    cleaned AS (
+        SELECT
+            area_ha,
+            landuse,
+            ST_Multi(
+                ST_CollectionExtract(
+                    ST_MakeValid(geom),
+                    3
+                )
+            )::geometry(MultiPolygon, 25832) AS geom
+        FROM parcels_cut
+        WHERE geom IS NOT NULL AND NOT ST_IsEmpty(geom)
+    ),
+    near_grid AS (
+        SELECT
+            c.area_ha,
+            c.landuse,
+            c.geom
+        FROM cleaned c
+        WHERE EXISTS (
+            SELECT 1
+            FROM grid_infrastructure g
+            WHERE ST_DWithin(c.geom, g.geom, $4)
+        )
+    )
+    SELECT
+        area_ha::double precision AS area_ha,
+        landuse,
+        ST_AsGeoJSON(
+            ST_Transform(ST_SimplifyPreserveTopology(geom, $5), 4326),
+            6
+        )::jsonb AS geometry
+    FROM near_grid
+    WHERE NOT ST_IsEmpty(geom);
+"""
+
+# Rows per cursor round-trip; each batch becomes one chunk of the streamed response.
+_FETCH_BATCH_SIZE = 200
+_FEATURE_COLLECTION_START = b'{"type":"FeatureCollection","features":['
+_FEATURE_COLLECTION_END = b"]}"
+
+# Stands in for an unbounded envelope side (metres in EPSG:25832); finite so
+# ST_MakeEnvelope builds a valid box for the GiST index to prune with.
+_OPEN_ENVELOPE_BOUND = 1e9
+
+# Raised when Render drops an idle connection underneath the pool (error 08003).
+_RETRYABLE_ERRORS = (asyncpg.ConnectionDoesNotExistError, ConnectionResetError)
+
 class DatabaseConnectionError(Exception):
     pass
 
@@ -16,27 +121,76 @@ class DatabaseQueryError(Exception):
     pass
 
 class Database:
-    def __init__(self, database_url: str) -> None:
+    def __init__(
+        self,
+        database_url: str,
+        *,
+        pool_min_size: int = 2,
+        pool_max_size: int = 10,
+        idle_lifetime: int = 300,
+        tile_count: int = 2,
+    ) -> None:
         self._database_url = database_url
+        self._pool_min_size = pool_min_size
+        self._pool_max_size = pool_max_size
+        self._idle_lifetime = idle_lifetime
+        # Every tile holds a pooled connection (with an open transaction) for as
+        # long as its part of the response is streaming. Capping tiles at a
+        # quarter of the pool keeps room for about four concurrent analyses
+        # plus /health; more tiles trade request concurrency for per-request speed.
+        self._tile_count = max(1, min(tile_count, pool_max_size // 4))
+        # Per strip: [lower, upper) centre range plus its envelope
+        # (xmin, ymin, xmax, ymax) in EPSG:25832, computed on first use.
+        self._tile_bounds: list[tuple[float, ...]] | None = None
+        self._pool: asyncpg.Pool | None = None
+        # Serializes pool creation so concurrent callers don't each build a pool.
+        self._pool_lock = asyncio.Lock()
+        # The ARD tables are created offline by prepare_data.sql, so one
+        # successful check is enough for the lifetime of the process.
+        self._tables_verified = False
+        # Serialized responses keyed on the request parameters. Plain dict
+        # access from the single event loop thread, so no lock is needed.
+        self._result_cache: TTLCache[tuple[Any, ...], bytes] = TTLCache(maxsize=64, ttl=300)
 
     async def connect(self) -> None:
-        """Not used anymore (connection on demand)."""
-        pass
+        """Creates the connection pool if it does not exist yet."""
+        if self._pool is not None:
+            return
+        async with self._pool_lock:
+            # Another caller may have created the pool while we waited.
+            if self._pool is not None:
+                return
+            try:
+                self._pool = await asyncpg.create_pool(
+                    self._database_url,
+                    ssl=_SSL_CONTEXT,
+                    min_size=self._pool_min_size,
+                    max_size=self._pool_max_size,
+                    max_inactive_connection_lifetime=self._idle_lifetime,
+                    init=self._init_connection,
+                )
+            except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError) as exc:
+                raise DatabaseConnectionError("Database connection failed.") from exc
 
     async def disconnect(self) -> None:
-        """Not used anymore."""
-        pass
+        """Closes the connection pool."""
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
 
     async def ensure_connected(self) -> None:
-        """Not used anymore."""
-        pass
+        """Recreates the pool if startup could not reach the database."""
+        await self.connect()
 
-    def _get_ssl_context(self):
-        """Creates a permissive SSL context for Render internal connections."""
-        ctx = ssl.create_default_context()
-        ctx.check_hostname = False
-        ctx.verify_mode = ssl.CERT_NONE
-        return ctx
+    async def ping(self) -> bool:
+        """Returns True if a pooled connection can run a trivial query."""
+        await self.ensure_connected()
+        try:
+            async with self._pool.acquire() as conn:
+                return await conn.fetchval("SELECT 1") == 1
+        except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError):
+            logger.exception("Database ping failed")
+            return False
 
     async def analyze_sites(
         self,
@@ -45,120 +199,93 @@ class Database:
         exclude_nature: bool,
         min_area: float,
         max_grid_distance: int,
-    ) -> dict[str, Any]:
+        simplify_tolerance: float,
+    ) -> AsyncIterator[bytes]:
         """
-        Runs the spatial analysis using a fresh connection for each request.
-        This avoids connection pool issues (error 08003) on Render free tier.
+        Runs the spatial analysis and yields the FeatureCollection as JSON
+        chunks. The parcels are split into vertical strips that are queried
+        concurrently on separate pooled connections; each batch read from a
+        strip's server-side cursor becomes one chunk. Each strip keeps a pooled
+        connection until its rows have been sent, so a cache miss occupies
+        tile_count connections for the whole response. The first chunk is only
+        yielded once a batch has been fetched, so query errors surface before
+        any bytes are sent. A connection dropped by the server (error 08003 on
+        Render free tier) is retried once.
+        Complete results are cached for a few minutes per parameter combination.
         """
-        conn = None
-        try:
-            # Create a fresh connection
-            conn = await asyncpg.connect(
-                self._database_url, 
-                ssl=self._get_ssl_context()
-            )
-
-            # Check if tables exist
-            await self._ensure_analysis_tables(conn)
-
-            sql = """
-                WITH parcels AS (
-                    SELECT
-                        ROW_NUMBER() OVER (ORDER BY area_ha DESC, landuse) AS id,
-                        area_ha,
-                        landuse,
-                        geom
-                    FROM candidate_parcels
-                    WHERE area_ha >= $1
-                      AND geom IS NOT NULL
-                      AND NOT ST_IsEmpty(geom)
-                ),
-                exclusions AS (
-                    SELECT
-                        ST_UnaryUnion(
-                            ST_Collect(
-                                CASE
-                                    WHEN category = 'residential' THEN ST_Buffer(geom, $2)
-                                    WHEN $3 AND category IN ('woodland', 'park', 'water', 'nature_reserve') THEN geom
-                                    ELSE NULL
-                                END
-                            )
-                        ) AS geom
-                    FROM exclusion_zones
-                    WHERE category = 'residential'
-                       OR ($3 AND category IN ('woodland', 'park', 'water', 'nature_reserve'))
-                ),
-                parcels_cut AS (
-                    SELECT
-                        p.id,
-                        p.area_ha,
-                        p.landuse,
-                        CASE
-                            WHEN e.geom IS NULL THEN p.geom
-                            WHEN NOT ST_Intersects(p.geom, e.geom) THEN p.geom
-                            ELSE ST_Difference(p.geom, e.geom)
-                        END AS geom
-                    FROM parcels p
-                    CROSS JOIN exclusions e
-                ),
-                cleaned AS (
-                    SELECT
-                        id,
-                        area_ha,
-                        landuse,
-                        ST_Multi(
-                            ST_CollectionExtract(
-                                ST_MakeValid(geom),
-                                3
-                            )
-                        )::geometry(MultiPolygon, 25832) AS geom
-                    FROM parcels_cut
-                    WHERE geom IS NOT NULL AND NOT ST_IsEmpty(geom)
-                ),
-                near_grid AS (
-                    SELECT
-                        c.id,
-                        c.area_ha,
-                        c.landuse,
-                        c.geom
-                    FROM cleaned c
-                    WHERE EXISTS (
-                        SELECT 1
-                        FROM grid_infrastructure g
-                        WHERE ST_DWithin(c.geom, g.geom, $4)
-                    )
-                )
-                SELECT
-                    id,
-                    area_ha,
-                    landuse,
-                    ST_AsGeoJSON(ST_Transform(geom, 4326)) AS geometry
-                FROM near_grid
-                WHERE NOT ST_IsEmpty(geom);
-            """
+        cache_key = (
+            buffer_distance,
+            exclude_nature,
+            min_area,
+            max_grid_distance,
+            simplify_tolerance,
+        )
+        cached = self._result_cache.get(cache_key)
+        if cached is not None:
+            yield cached
+            return
 
-            rows = await conn.fetch(
-                sql, 
-                min_area, 
-                buffer_distance, 
-                exclude_nature, 
-                max_grid_distance
-            )
+        args = (
+            min_area,
+            buffer_distance,
+            exclude_nature,
+            max_grid_distance,
+            simplify_tolerance,
+        )
+        chunks: list[bytes] = []
+        try:
+            await self.ensure_connected()
+            for attempt in range(2):
+                try:
+                    if not self._tables_verified or not self._tile_bounds:
+                        async with self._pool.acquire() as conn:
+                            # Check if tables exist (first request only)
+                            if not self._tables_verified:
+                                await self._ensure_analysis_tables(conn)
+                                self._tables_verified = True
+                            if not self._tile_bounds:
+                                self._tile_bounds = await self._compute_tile_bounds(conn)
 
-            features: list[dict[str, Any]] = []
-            for row in rows:
-                features.append({
-                    "type": "Feature",
-                    "geometry": json.loads(row["geometry"]),
-                    "properties": {
-                        "id": row["id"],
-                        "area_ha": float(row["area_ha"]),
-                        "landuse": row["landuse"],
-                    },
-                })
+                    # Tiles number their rows independently, so ids are assigned here.
+                    feature_ids = itertools.count(1)
+                    separator = _FEATURE_COLLECTION_START
+                    async with aclosing(self._fetch_tiles(args)) as batches:
+                        async for rows in batches:
+                            # Records unpack positionally in _ANALYZE_SQL column
+                            # order, avoiding a key lookup per column.
+                            features = [
+                                {
+                                    "type": "Feature",
+                                    "geometry": geometry,
+                                    "properties": {
+                                        "id": feature_id,
+                                        "area_ha": area_ha,
+                                        "landuse": landuse,
+                                    },
+                                }
+                                for (area_ha, landuse, geometry), feature_id in zip(rows, feature_ids)
+                            ]
+                            # Strip the list brackets to get comma-joined features.
+                            chunk = separator + orjson.dumps(features)[1:-1]
+                            separator = b","
+                            chunks.append(chunk)
+                            yield chunk
+                    break
+                except _RETRYABLE_ERRORS:
+                    # Bytes already sent cannot be taken back.
+                    if attempt or chunks:
+                        raise
+                    logger.warning("Database connection dropped, retrying analysis.")
 
-            return {"type": "FeatureCollection", "features": features}
+            tail = _FEATURE_COLLECTION_END
+            if not chunks:
+                tail = _FEATURE_COLLECTION_START + tail
+            chunks.append(tail)
+            yield tail
+            self._result_cache[cache_key] = b"".join(chunks)
 
+        except (DatabaseConnectionError, DatabaseQueryError):
+            raise
         except Exception as exc:
             logger.exception("Analysis failed")
             # Map common errors to custom exceptions
@@ -169,16 +296,87 @@ class Database:
                  raise DatabaseConnectionError("Database connection failed.") from exc
             raise DatabaseQueryError(f"Analysis query failed: {msg}") from exc
 
+    async def _fetch_tiles(self, args: tuple[Any, ...]) -> AsyncIterator[list[asyncpg.Record]]:
+        """Yields row batches from all tiles as they arrive, re-raising tile errors."""
+        # Bounded so fast tiles wait for the response instead of buffering rows.
+        queue: asyncio.Queue[Any] = asyncio.Queue(maxsize=len(self._tile_bounds))
+
+        async def fetch_tile(bounds: tuple[float, ...]) -> None:
+            try:
+                async with self._pool.acquire() as conn:
+                    # Server-side cursors only live inside a transaction.
+                    async with conn.transaction():
+                        cursor = await conn.cursor(_ANALYZE_SQL, *args, *bounds)
+                        while rows := await cursor.fetch(_FETCH_BATCH_SIZE):
+                            await queue.put(rows)
+            except Exception as exc:
+                await queue.put(exc)
+            else:
+                await queue.put(None)
+
+        tasks = [asyncio.create_task(fetch_tile(bounds)) for bounds in self._tile_bounds]
+        try:
+            pending = len(tasks)
+            while pending:
+                item = await queue.get()
+                if item is None:
+                    pending -= 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    yield item
         finally:
-            if conn:
-                await conn.close()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _compute_tile_bounds(self, conn) -> list[tuple[float, ...]]:
+        """Splits the candidate parcel extent into equal-width x strips."""
+        row = await conn.fetchrow(
+            """
+            SELECT ST_XMin(extent) AS xmin, ST_XMax(extent) AS xmax
+            FROM (SELECT ST_Extent(geom) AS extent FROM candidate_parcels) s;
+            """
+        )
+        # No parcels yet: nothing to query, and the empty list is not cached.
+        if row["xmin"] is None:
+            return []
+
+        # Only the inner cuts come from the cached extent. The outer sides stay
+        # open so parcels added beyond it by a prepare_data.sql re-run still match.
+        xmin, xmax = row["xmin"], row["xmax"]
+        width = (xmax - xmin) / self._tile_count
+        cuts = [xmin + width * i for i in range(1, self._tile_count)]
+        lowers = [-math.inf, *cuts]
+        uppers = [*cuts, math.inf]
+        return [
+            (
+                lower,
+                upper,
+                max(lower, -_OPEN_ENVELOPE_BOUND),
+                -_OPEN_ENVELOPE_BOUND,
+                min(upper, _OPEN_ENVELOPE_BOUND),
+                _OPEN_ENVELOPE_BOUND,
+            )
+            for lower, upper in zip(lowers, uppers)
+        ]
+
+    async def _init_connection(self, conn) -> None:
+        """Decodes jsonb columns with orjson instead of leaving them as text."""
+        await conn.set_type_codec(
+            "jsonb",
+            encoder=lambda value: orjson.dumps(value).decode(),
+            decoder=orjson.loads,
+            schema="pg_catalog",
+            format="text",
+        )
 
     async def _ensure_analysis_tables(self, conn) -> None:
         """Checks if required tables exist using the provided connection."""
         missing_tables = await conn.fetch(
             """
             WITH required(table_name) AS (
-                VALUES ('candidate_parcels'), ('exclusion_zones'), ('grid_infrastructure')
+                VALUES ('candidate_parcels'), ('exclusion_zones_buffered'), ('grid_infrastructure')
             )
             SELECT table_name
             FROM required
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
 import logging
-from typing import Any
+from contextlib import aclosing
+from typing import AsyncIterator
 
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 try:
     from .config import get_settings
@@ -17,7 +19,13 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
-database = Database(settings.database_url)
+database = Database(
+    settings.database_url,
+    pool_min_size=settings.db_pool_min,
+    pool_max_size=settings.db_pool_max,
+    idle_lifetime=settings.db_idle_lifetime,
+    tile_count=settings.analysis_tile_count,
+)
 allow_all_origins = "*" in settings.cors_origins
 
 app = FastAPI(
@@ -36,10 +44,14 @@ app.add_middleware(
 
 
 class AnalyzeRequest(BaseModel):
-    buffer_distance: int = Field(default=500, ge=0, le=2000)
+    model_config = ConfigDict(extra="forbid")
+
+    # Residential buffers are precomputed in 250 m steps (exclusion_zones_buffered).
+    buffer_distance: int = Field(default=500, ge=0, le=2000, multiple_of=250)
     exclude_nature: bool = Field(default=True)
     min_area: float = Field(default=2.0, ge=0.1)
     max_grid_distance: int = Field(default=2000, ge=100, le=10000)
+    simplify_tolerance: float = Field(default=1.0, ge=0.0, le=50.0)
 
 
 @app.on_event("startup")
@@ -58,7 +70,6 @@ async def shutdown_event() -> None:
 @app.get("/health")
 async def health_check() -> dict[str, str]:
     try:
-        await database.ensure_connected()
         if not await database.ping():
             raise HTTPException(status_code=503, detail="Database unavailable.")
     except DatabaseConnectionError as exc:
@@ -66,17 +77,30 @@ async def health_check() -> dict[str, str]:
     return {"status": "ok"}
 
 
+async def _prepend(first_chunk: bytes, chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    # Close the analysis stream right away on disconnect so its cursors and
+    # pooled connections are released instead of waiting for the GC.
+    async with aclosing(chunks):
+        yield first_chunk
+        async for chunk in chunks:
+            yield chunk
+
+
 @app.post("/api/analyze")
-async def analyze(payload: AnalyzeRequest) -> dict[str, Any]:
+async def analyze(payload: AnalyzeRequest) -> StreamingResponse:
     try:
-        await database.ensure_connected()
-        return await database.analyze_sites(
+        chunks = database.analyze_sites(
             buffer_distance=payload.buffer_distance,
             exclude_nature=payload.exclude_nature,
             min_area=payload.min_area,
             max_grid_distance=payload.max_grid_distance,
+            simplify_tolerance=payload.simplify_tolerance,
         )
+        # Pull the first chunk before responding so query errors still map to
+        # proper status codes instead of a truncated 200 response.
+        first_chunk = await anext(chunks)
     except DatabaseConnectionError as exc:
         raise HTTPException(status_code=503, detail=str(exc)) from exc
     except DatabaseQueryError as exc:
         raise HTTPException(status_code=500, detail=str(exc)) from exc
+    return StreamingResponse(_prepend(first_chunk, chunks), media_type="application/json")
@@ -6,6 +6,8 @@ const API_BASE_URL = (
 const ANALYZE_ENDPOINT = `${API_BASE_URL}/api/analyze`;
 const HEALTH_ENDPOINT = `${API_BASE_URL}/health`;
 const DEBUG_ANALYSIS = import.meta.env.DEV;
+// Must match the buffer steps precomputed in exclusion_zones_buffered.
+const BUFFER_STEP = 250;
 
 const emptyFeatureCollection = {
   type: "FeatureCollection",
@@ -31,7 +33,11 @@ export function useAnalysis() {
     errorMessage.value = "";
 
     const payload = {
-      buffer_distance: clamp(Number(bufferDistance.value), 0, 2000),
+      buffer_distance: clamp(
+        Math.round(Number(bufferDistance.value) / BUFFER_STEP) * BUFFER_STEP,
+        0,
+        2000,
+      ),
       exclude_nature: Boolean(excludeNature.value),
       min_area: Math.max(Number(minArea.value), 0.1),
       max_grid_distance: clamp(Number(maxGridDistance.value), 100, 10000),
@@ -151,6 +151,29 @@ GROUP BY category;
 
 CREATE INDEX exclusion_zones_geom_gix ON exclusion_zones USING GIST (geom);
 
+-- 2b) exclusion_zones_buffered (precomputed settlement buffers, subdivided for the GiST index)
+-- The API only accepts buffer distances in 250 m steps, so every residential buffer
+-- it can ask for is computed here once. Other categories are never buffered (buffer_m = 0).
+DROP TABLE IF EXISTS exclusion_zones_buffered;
+CREATE TABLE exclusion_zones_buffered AS
+SELECT
+  z.category,
+  b.buffer_m,
+  ST_Subdivide(ST_Buffer(z.geom, b.buffer_m), 256)::geometry(Polygon, 25832) AS geom
+FROM exclusion_zones z
+CROSS JOIN generate_series(0, 2000, 250) AS b(buffer_m)
+WHERE z.category = 'residential'
+UNION ALL
+SELECT
+  z.category,
+  0 AS buffer_m,
+  ST_Subdivide(z.geom, 256)::geometry(Polygon, 25832) AS geom
+FROM exclusion_zones z
+WHERE z.category <> 'residential';
+
+CREATE INDEX exclusion_zones_buffered_geom_gix ON exclusion_zones_buffered USING GIST (geom);
+CREATE INDEX exclusion_zones_buffered_category_idx ON exclusion_zones_buffered (category, buffer_m);
+
 -- 3) grid_infrastructure
 DROP TABLE IF EXISTS grid_infrastructure;
 CREATE TABLE grid_infrastructure AS
@@ -176,4 +199,5 @@ CREATE INDEX grid_infrastructure_geom_gix ON grid_infrastructure USING GIST (geo
 
 ANALYZE candidate_parcels;
 ANALYZE exclusion_zones;
+ANALYZE exclusion_zones_buffered;
 ANALYZE grid_infrastructure;